@@ -1,7 +1,18 @@
-from src.models import Location
+import numpy as np
+from src.models import COORDINATE_DTYPE, Location
 from src.system_manager import SystemManager
 from src.igps import IGPS
 
+MAX_MAP_LABELS = 50  # Galaxy map only draws location names up to this many locations
+
+
+def _route_xyz(route):
+    """Get plot-ready x, y, z arrays and names for a route's named locations.
+    Swaps the Y and Z axes so galaxy height is drawn as the vertical axis."""
+    stops = [loc for loc in route.locations if isinstance(loc, Location)]
+    pts = np.array([loc.position for loc in stops], dtype=COORDINATE_DTYPE).reshape(-1, 3)
+    return pts[:, 0], pts[:, 2], pts[:, 1], [loc.name for loc in stops]
+
 
 def main():
     # Initialize system
@@ -15,23 +26,25 @@ def main():
     print(f"Galaxy specifications: {IGPS.GALAXY_RADIUS} LY radius, {IGPS.GALAXY_HEIGHT} LY height")
     print(f"Spacecraft specs: {IGPS.AVG_SPEED} LY/hr, {IGPS.FUEL_EFFICIENCY} LY/gal, {IGPS.TANK_CAPACITY} gal tank\n")
 
-    # Solar System - approximately 27,000 LY from galactic center
-    system.admin_add_location(Location("Solar System", "Star System", (23000, 250, 1000)))
+    system.admin_add_locations([
+        # Solar System - approximately 27,000 LY from galactic center
+        Location("Solar System", "Star System", (23000, 250, 1000)),
 
-    # Galactic Center
-    system.admin_add_location(Location("Sagittarius A*", "Black Hole", (0, 0, 0)))
+        # Galactic Center
+        Location("Sagittarius A*", "Black Hole", (0, 0, 0)),
 
-    # Alpha Centauri - closest star system to Solar System (~4.37 LY away)
-    system.admin_add_location(Location("Alpha Centauri", "Star System", (23004, 250, 1001)))
+        # Alpha Centauri - closest star system to Solar System (~4.37 LY away)
+        Location("Alpha Centauri", "Star System", (23004, 250, 1001)),
 
-    # Andromeda Station - fictional station in the outer rim
-    system.admin_add_location(Location("Andromeda Station", "Space Station", (45000, 300, 2000)))
+        # Andromeda Station - fictional station in the outer rim
+        Location("Andromeda Station", "Space Station", (45000, 300, 2000)),
 
-    # Orion Nebula region
-    system.admin_add_location(Location("Orion Nebula", "Nebula", (24000, 100, -1500)))
+        # Orion Nebula region
+        Location("Orion Nebula", "Nebula", (24000, 100, -1500)),
 
-    # Kepler Mining Colony - mid-rim location
-    system.admin_add_location(Location("Kepler Colony", "Mining Station", (15000, -200, 500)))
+        # Kepler Mining Colony - mid-rim location
+        Location("Kepler Colony", "Mining Station", (15000, -200, 500)),
+    ])
     print()
 
     # Register a member
@@ -90,9 +103,11 @@ def main():
     print("Adding three new planets to the database...")
 
     # Add three planets with specific names
-    system.admin_add_location(Location("Evil_Planet", "Exoplanet", (8000, -150, 3000)))
-    system.admin_add_location(Location("Glibglob", "Colony World", (42000, 400, -8000)))
-    system.admin_add_location(Location("Innocent_Planet", "Research Station", (5000, 100, -2000)))
+    system.admin_add_locations([
+        Location("Evil_Planet", "Exoplanet", (8000, -150, 3000)),
+        Location("Glibglob", "Colony World", (42000, 400, -8000)),
+        Location("Innocent_Planet", "Research Station", (5000, 100, -2000)),
+    ])
 
     print("\nCreating exploration route: Evil_Planet -> Glibglob -> Innocent_Planet")
     exploration_route = system.igps.optimize_route(["Evil_Planet", "Glibglob", "Innocent_Planet"])
@@ -121,54 +136,42 @@ def main():
         from mpl_toolkits.mplot3d import Axes3D
 
         # Create figure with subplots for multiple routes (2x3 grid)
-        fig = plt.figure(figsize=(20, 12))
+        fig, axes = plt.subplots(2, 3, figsize=(20, 12), subplot_kw={'projection': '3d'})
+        axes = axes.ravel()
 
+        # (route, title, show stop order in title, line color, point color)
         routes_to_visualize = [
-            (local_route, "Local Route:\nSolar System → Alpha Centauri", 1, 'blue', 'red'),
-            (long_route, "Long Distance Route:\nSolar System → Andromeda Station", 2, 'green', 'orange'),
-            (multi_route, "Multi-Stop Optimized Route", 3, 'magenta', 'purple'),
-            (test_route, "Route with Optimized Stop", 4, 'cyan', 'cyan'),
-            (exploration_route, "Random Exploration Route", 5, 'red', 'lime')
+            (local_route, "Local Route:\nSolar System → Alpha Centauri", False, 'blue', 'red'),
+            (long_route, "Long Distance Route:\nSolar System → Andromeda Station", False, 'green', 'orange'),
+            (multi_route, "Multi-Stop Optimized Route", True, 'magenta', 'purple'),
+            (test_route, "Route with Optimized Stop", False, 'cyan', 'cyan'),
+            (exploration_route, "Random Exploration Route", True, 'red', 'lime')
         ]
 
-        for route, title, position, line_color, point_color in routes_to_visualize:
-            if route:
-                ax = fig.add_subplot(2, 3, position, projection='3d')
-                
-                x_coords = []
-                y_coords = []
-                z_coords = []
-                names = []
-
-                for loc in route.locations:
-                    if isinstance(loc, Location):
-                        x_coords.append(loc.position[0])
-                        y_coords.append(loc.position[2])  # Z becomes Y (up/down)
-                        z_coords.append(loc.position[1])  # Y becomes Z (depth)
-                        names.append(loc.name)
-
-                ax.plot(x_coords, y_coords, z_coords, f'{line_color[0]}-', linewidth=2, label='Route Path')
-                ax.scatter(x_coords, y_coords, z_coords, c=point_color, s=100, marker='o')
+        for ax, (route, title, show_order, line_color, point_color) in zip(axes[:5], routes_to_visualize):
+            if not route:
+                ax.set_axis_off()
+            else:
+                x_coords, y_coords, z_coords, names = _route_xyz(route)
+
+                ax.plot(x_coords, y_coords, z_coords, f'{line_color[0]}-', linewidth=2, label='Route Path', rasterized=True)
+                ax.scatter(x_coords, y_coords, z_coords, c=point_color, s=100, marker='o', rasterized=True)
                 
-                for i, name in enumerate(names):
-                    ax.text(x_coords[i], y_coords[i], z_coords[i], f'  {name}', fontsize=7)
+                for x, y, z, name in zip(x_coords.tolist(), y_coords.tolist(), z_coords.tolist(), names):
+                    ax.text(x, y, z, f'  {name}', fontsize=7)
 
                 ax.set_xlabel('X (Light Years)')
                 ax.set_ylabel('Z (Light Years) - Height')
                 ax.set_zlabel('Y (Light Years) - Depth')
                 
-                if position == 3 and multi_route:
-                    full_title = title + ":\n" + ' → '.join(names)
-                    ax.set_title(full_title)
-                elif position == 5 and exploration_route:
-                    full_title = title + ":\n" + ' → '.join(names)
-                    ax.set_title(full_title)
+                if show_order:
+                    ax.set_title(title + ":\n" + ' → '.join(names))
                 else:
                     ax.set_title(title)
                 ax.legend()
 
         # Plot 6: All routes comparison overlay
-        ax6 = fig.add_subplot(2, 3, 6, projection='3d')
+        ax6 = axes[5]
 
         routes_overlay = [
             (local_route, 'blue', 'o', 'Local Route'),
@@ -179,12 +182,10 @@ def main():
 
         for route, color, marker, label in routes_overlay:
             if route:
-                x_coords = [loc.position[0] for loc in route.locations if isinstance(loc, Location)]
-                y_coords = [loc.position[2] for loc in route.locations if isinstance(loc, Location)]
-                z_coords = [loc.position[1] for loc in route.locations if isinstance(loc, Location)]
+                x_coords, y_coords, z_coords, _ = _route_xyz(route)
 
-                ax6.plot(x_coords, y_coords, z_coords, color=color, linewidth=1.5, alpha=0.7)
-                ax6.scatter(x_coords, y_coords, z_coords, c=color, s=80, marker=marker, label=label, alpha=0.8)
+                ax6.plot(x_coords, y_coords, z_coords, color=color, linewidth=1.5, alpha=0.7, rasterized=True)
+                ax6.scatter(x_coords, y_coords, z_coords, c=color, s=80, marker=marker, label=label, alpha=0.8, rasterized=True)
 
         ax6.scatter([0], [0], [0], c='black', s=200, marker='X', label='Galactic Center')
         ax6.set_xlabel('X (Light Years)')
@@ -195,35 +196,32 @@ def main():
         ax6.view_init(elev=25, azim=45)
 
         plt.tight_layout()
-        plt.savefig('igps_routes_3d.png', dpi=150, bbox_inches='tight')
+        plt.savefig('igps_routes_3d.png', dpi=100)
         print("✓ 3D visualization saved as 'igps_routes_3d.png'")
 
         # Create a single comprehensive view showing all locations
         fig2 = plt.figure(figsize=(14, 10))
         ax_all = fig2.add_subplot(111, projection='3d')
 
-        all_x = []
-        all_y = []
-        all_z = []
-        all_names = []
-
-        for name, loc in system.database.all_locations.items():
-            all_x.append(loc.position[0])
-            all_y.append(loc.position[2])
-            all_z.append(loc.position[1])
-            all_names.append(name)
+        coords = system.database.coordinates()
+        all_x = coords[:, 0]
+        all_y = coords[:, 2]  # Z becomes Y (up/down)
+        all_z = coords[:, 1]  # Y becomes Z (depth)
+        all_names = system.database.location_names()
 
         ax_all.scatter(all_x, all_y, all_z, c='gold', s=150, marker='*',
-                      label='Galaxy Locations', edgecolors='black', linewidths=1)
+                      label='Galaxy Locations', edgecolors='black', linewidths=1, rasterized=True)
 
-        for i, name in enumerate(all_names):
-            ax_all.text(all_x[i], all_y[i], all_z[i], f'  {name}', fontsize=9, weight='bold')
+        # One text artist per location gets slow to draw as the database grows, so only label small maps
+        if len(all_names) <= MAX_MAP_LABELS:
+            for x, y, z, name in zip(all_x.tolist(), all_y.tolist(), all_z.tolist(), all_names):
+                ax_all.text(x, y, z, f'  {name}', fontsize=9, weight='bold')
+        else:
+            print(f"Galaxy map has {len(all_names)} locations; labels skipped (limit {MAX_MAP_LABELS}).")
 
         if multi_route:
-            route_x = [loc.position[0] for loc in multi_route.locations if isinstance(loc, Location)]
-            route_y = [loc.position[2] for loc in multi_route.locations if isinstance(loc, Location)]
-            route_z = [loc.position[1] for loc in multi_route.locations if isinstance(loc, Location)]
-            ax_all.plot(route_x, route_y, route_z, 'r-', linewidth=3, label='Sample Route', alpha=0.7)
+            route_x, route_y, route_z, _ = _route_xyz(multi_route)
+            ax_all.plot(route_x, route_y, route_z, 'r-', linewidth=3, label='Sample Route', alpha=0.7, rasterized=True)
 
         ax_all.scatter([0], [0], [0], c='black', s=300, marker='X', label='Galactic Center')
 
@@ -234,7 +232,8 @@ def main():
         ax_all.legend(fontsize=10)
         ax_all.view_init(elev=20, azim=45)
 
-        plt.savefig('igps_galaxy_map.png', dpi=150, bbox_inches='tight')
+        fig2.tight_layout()
+        plt.savefig('igps_galaxy_map.png', dpi=150)
         print("✓ Galaxy map saved as 'igps_galaxy_map.png'")
         plt.show()
 
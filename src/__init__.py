@@ -0,0 +1 @@
+"""Interstellar Galaxy Positioning System package."""
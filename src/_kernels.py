@@ -0,0 +1,150 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the NumPy versions below are used without it
+    njit = None
+
+
+def _nn_tour_loops(pts):
+    """Nearest neighbor tour over an (N, 3) float64 array, starting from row 0.
+    Written as plain loops so Numba can compile it; compares squared distances to skip sqrt."""
+    n = pts.shape[0]
+    visited = np.zeros(n, np.bool_)
+    order = np.empty(n, np.int64)
+    order[0] = 0
+    visited[0] = True
+
+    for k in range(1, n):
+        current = order[k - 1]
+        best = -1
+        best_dist = np.inf
+        for j in range(n):
+            if not visited[j]:
+                dx = pts[current, 0] - pts[j, 0]
+                dy = pts[current, 1] - pts[j, 1]
+                dz = pts[current, 2] - pts[j, 2]
+                dist = dx * dx + dy * dy + dz * dz
+                if dist < best_dist:
+                    best_dist = dist
+                    best = j
+        visited[best] = True
+        order[k] = best
+
+    return order
+
+
+def _nn_tour_numpy(pts):
+    """Nearest neighbor tour over an (N, 3) float64 array, starting from row 0, using NumPy."""
+    n = pts.shape[0]
+    diff = pts[:, None, :] - pts[None, :, :]
+    dist_sq = (diff * diff).sum(axis=-1)
+    visited = np.zeros(n, dtype=bool)
+    order = np.empty(n, dtype=np.int64)
+    order[0] = 0
+    visited[0] = True
+
+    for k in range(1, n):
+        row = dist_sq[order[k - 1]].copy()
+        row[visited] = np.inf
+        order[k] = row.argmin()
+        visited[order[k]] = True
+
+    return order
+
+
+def distance_matrix(pts, others=None):
+    """(N, M) matrix of Euclidean distances from each row of pts to each row of others,
+    both (N, 3) / (M, 3) float64 arrays. With others omitted, distances between the rows of pts."""
+    if others is None:
+        others = pts
+    diff = pts[:, None, :] - others[None, :, :]
+    return np.sqrt((diff * diff).sum(axis=-1))
+
+
+def _two_opt_loops(order, dist):
+    """Improve an open tour in place by reversing segments while that shortens it (2-opt).
+    The first stop stays fixed; the last stop is free to change. Uses only the distance matrix."""
+    n = order.shape[0]
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                before = dist[order[i - 1], order[i]]
+                after = dist[order[i - 1], order[j]]
+                if j < n - 1:
+                    before += dist[order[j], order[j + 1]]
+                    after += dist[order[i], order[j + 1]]
+                if after < before - 1e-9:
+                    order[i:j + 1] = order[i:j + 1][::-1].copy()
+                    improved = True
+    return order
+
+
+def _two_opt_numpy(order, dist):
+    """Improve an open tour in place with 2-opt, using NumPy when Numba is unavailable.
+    Each pass scores every (i, j) segment reversal at once and applies the best one."""
+    n = order.shape[0]
+    if n < 3:
+        return order  # With the start fixed, there is nothing to reorder
+    # Extra zero-distance row/column stands in for the missing stop after the end of the path
+    padded = np.zeros((dist.shape[0] + 1, dist.shape[1] + 1))
+    padded[:-1, :-1] = dist
+    end = dist.shape[0]
+    i = np.arange(1, n - 1)[:, None]
+    j = np.arange(2, n)[None, :]
+    valid = j > i
+
+    while True:
+        ext = np.append(order, end)
+        before = padded[ext[i - 1], ext[i]] + padded[ext[j], ext[j + 1]]
+        after = padded[ext[i - 1], ext[j]] + padded[ext[i], ext[j + 1]]
+        gain = np.where(valid, before - after, -np.inf)
+        best = gain.argmax()
+        if gain.flat[best] <= 1e-9:
+            return order
+        bi, bj = np.unravel_index(best, gain.shape)
+        start, stop = bi + 1, bj + 3  # Rows start at i = 1 and columns at j = 2; reverse order[i:j + 1]
+        order[start:stop] = order[start:stop][::-1].copy()
+
+
+def _insertion_costs_loops(pts, new):
+    """Extra distance from inserting point new into an (N, 3) float64 route after each row.
+    Entry k is the cost of inserting at index k + 1; the last entry appends at the end.
+    Written as plain loops so Numba can compile it."""
+    n = pts.shape[0]
+    costs = np.empty(n, np.float64)
+    to_new = np.empty(n, np.float64)
+    for k in range(n):
+        dx = pts[k, 0] - new[0]
+        dy = pts[k, 1] - new[1]
+        dz = pts[k, 2] - new[2]
+        to_new[k] = np.sqrt(dx * dx + dy * dy + dz * dz)
+
+    for k in range(n - 1):
+        dx = pts[k + 1, 0] - pts[k, 0]
+        dy = pts[k + 1, 1] - pts[k, 1]
+        dz = pts[k + 1, 2] - pts[k, 2]
+        costs[k] = to_new[k] + to_new[k + 1] - np.sqrt(dx * dx + dy * dy + dz * dz)
+    costs[n - 1] = to_new[n - 1]  # Appending only adds the last -> new segment
+    return costs
+
+
+def _insertion_costs_numpy(pts, new):
+    """Extra distance from inserting point new into an (N, 3) float64 route after each row, using NumPy."""
+    to_new = np.linalg.norm(pts - new, axis=1)
+    segments = np.linalg.norm(pts[1:] - pts[:-1], axis=1)
+    costs = to_new.copy()  # Appending only adds the last -> new segment
+    costs[:-1] += to_new[1:] - segments
+    return costs
+
+
+if njit is not None:
+    nn_tour = njit(cache=True)(_nn_tour_loops)
+    two_opt = njit(cache=True)(_two_opt_loops)
+    insertion_costs = njit(cache=True, fastmath=True)(_insertion_costs_loops)
+else:
+    nn_tour = _nn_tour_numpy
+    two_opt = _two_opt_numpy
+    insertion_costs = _insertion_costs_numpy
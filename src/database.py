@@ -1,4 +1,4 @@
-import numpy as np
+from src.models import _stack_positions, coordinates_in_bounds, positions_in_bounds, segment_length
 
 
 class LocationsDatabase:
@@ -23,38 +23,61 @@ class LocationsDatabase:
         print(f"Location '{location.name}' added successfully.")
         return True
 
+    def add_locations(self, locations):
+        """Add several locations to the database, validating all their coordinates in one pass.
+        Returns the number of locations added."""
+        new_locations = []
+        new_names = set()
+        for location in locations:
+            if location.name in self.all_locations or location.name in new_names:
+                print(f"Location '{location.name}' already exists.")
+                continue
+            new_locations.append(location)
+            new_names.add(location.name)
+
+        if not new_locations:
+            return 0
+
+        pts = _stack_positions(new_locations, all_named=True)
+        for location, valid in zip(new_locations, positions_in_bounds(pts).tolist()):
+            if not valid:
+                print(f"Note: Location '{location.name}' has coordinates outside typical galaxy bounds.")
+
+        for location in new_locations:
+            self.all_locations[location.name] = location
+            self.location_types.add(location.location_type)
+        print(f"{len(new_locations)} location(s) added successfully: "
+              + ", ".join(location.name for location in new_locations))
+        return len(new_locations)
+
     def _check_coordinates(self, position):
         """Internal method to check if coordinates are reasonable."""
         # Radius: 50,000 Light Years
         # Height: ±500 Light Years
         x, y, z = position
-        radius = np.sqrt(x**2 + z**2)
-        return radius <= 50000 and abs(y) <= 500
+        return coordinates_in_bounds(x, y, z)
 
     def remove_location(self, location_name):
         """Remove a location from the database."""
-        if location_name not in self.all_locations:
+        if self.all_locations.pop(location_name, None) is None:
             print(f"Location '{location_name}' not found.")
             return False
-        del self.all_locations[location_name]
         print(f"Location '{location_name}' removed successfully.")
         return True
 
     def edit_location(self, location_name, new_name=None, new_type=None, new_position=None):
         """Edit an existing location's details."""
-        if location_name not in self.all_locations:
+        location = self.all_locations.get(location_name)
+        if location is None:
             print(f"Location '{location_name}' not found.")
             return False
 
-        location = self.all_locations[location_name]
-
         if new_name and new_name != location_name:
             if new_name in self.all_locations:
                 print(f"Location name '{new_name}' already exists.")
                 return False
-            del self.all_locations[location_name]
             location.set_name(new_name)
-            self.all_locations[new_name] = location
+            self.all_locations[new_name] = self.all_locations.pop(location_name)
 
         if new_type:
             location.set_type(new_type)
@@ -73,3 +96,16 @@ class LocationsDatabase:
     def location_exists(self, location_name):
         """Check if a location exists in the database."""
         return location_name in self.all_locations
+
+    def coordinates(self):
+        """Get an (N, 3) array of all location positions, in the same order as location_names().
+        Built from the Location objects on each call, so it always has their current positions."""
+        return _stack_positions(self.all_locations.values(), all_named=True)
+
+    def location_names(self):
+        """Get all location names, in the same order as the rows of coordinates()."""
+        return list(self.all_locations)
+
+    def distance(self, name_a, name_b):
+        """Get the distance between two locations in the database, from their current positions."""
+        return segment_length(self.all_locations[name_a], self.all_locations[name_b])
@@ -1,13 +1,23 @@
+import math
+from functools import lru_cache
 import numpy as np
-from src.models import Location, Route
+from src.models import (COORDINATE_DTYPE, GALAXY_HEIGHT, GALAXY_RADIUS, GALAXY_RADIUS_SQ, Location, Route,
+                        _stack_positions, coordinates_in_bounds, positions_in_bounds, segment_length)
+from src._kernels import distance_matrix, insertion_costs, nn_tour, two_opt
+
+
+@lru_cache(maxsize=1024)
+def _format_light_years(light_years):
+    """Format a distance already rounded to 2 decimal places, in light years."""
+    return f"{light_years:.2f} light years"
 
 
 class IGPS:
     """BUSINESS LOGIC LAYER: Intelligent Galaxy Positioning System"""
 
-    # Milky Way Galaxy specifications
-    GALAXY_RADIUS = 50000  # Light Years
-    GALAXY_HEIGHT = 500    # Light Years (half-height from center)
+    # Milky Way Galaxy specifications (aliases of the constants in src.models)
+    GALAXY_RADIUS = GALAXY_RADIUS
+    GALAXY_HEIGHT = GALAXY_HEIGHT
 
     # Average spacecraft specifications
     AVG_SPEED_MIN = 50
@@ -37,17 +47,49 @@ class IGPS:
     def format_distance(light_years):
         """Format distance in the most readable unit (light minutes or light years)."""
         if light_years < 0.01:
-            light_minutes = IGPS.light_years_to_light_minutes(light_years)
+            light_minutes = light_years * IGPS.LIGHT_MINUTES_PER_LIGHT_YEAR
             return f"{light_minutes:.2f} light minutes"
         else:
-            return f"{light_years:.2f} light years"
+            # Rounding first gives the same text and lets repeated distances share a cache entry
+            return _format_light_years(round(light_years, 2))
 
     @staticmethod
     def calculate_distance_between(loc1, loc2):
-        """Calculate Euclidean distance between two locations in 3D space using NumPy."""
-        pos1 = np.array(loc1.position if isinstance(loc1, Location) else loc1)
-        pos2 = np.array(loc2.position if isinstance(loc2, Location) else loc2)
-        return np.linalg.norm(pos2 - pos1)
+        """Calculate Euclidean distance between two locations in 3D space.
+        Accepts Location objects, (x, y, z) tuples, or NumPy coordinate arrays."""
+        # Plain scalar math from the current positions: NumPy setup costs more than the work for one 3-vector
+        return segment_length(loc1, loc2)
+
+    def calculate_distances_between(self, locations, other_locations):
+        """Calculate the distance from every location to every other location in one NumPy pass.
+        Returns an (N, M) array; accepts Location objects or (x, y, z) coordinates."""
+        pts = _stack_positions(locations)
+        others = _stack_positions(other_locations)
+        return distance_matrix(pts, others)
+
+    def pairwise_distances(self, locations):
+        """Calculate the (N, N) array of distances between every pair of locations."""
+        return distance_matrix(_stack_positions(locations))
+
+    def _resolve_locations(self, location_inputs):
+        """Resolve every location name or coordinate once, or return None if any is invalid."""
+        if all(isinstance(loc_input, str) for loc_input in location_inputs):
+            # All names: check them with one set difference, then index the database directly
+            all_locations = self.database.all_locations
+            missing = set(location_inputs) - all_locations.keys()
+            if missing:
+                first_missing = next(name for name in location_inputs if name in missing)
+                print(f"Error: Location '{first_missing}' does not exist in the database.")
+                return None
+            return [all_locations[name] for name in location_inputs]
+
+        locations = []
+        for loc_input in location_inputs:
+            loc = self.get_location(loc_input)
+            if loc is None:
+                return None
+            locations.append(loc)
+        return locations
 
     def get_location(self, location_input):
         """Get a location from database by name, or return coordinates directly."""
@@ -74,24 +116,30 @@ class IGPS:
 
     def calculate_route_distance(self, route):
         """Calculate total distance for a route."""
-        total_distance = 0
-        for i in range(len(route.locations) - 1):
-            total_distance += self.calculate_distance_between(route.locations[i], route.locations[i + 1])
+        pts = route.coordinates()
+        # One vectorized pass over all segments instead of a NumPy call per segment
+        total_distance = float(np.linalg.norm(pts[1:] - pts[:-1], axis=1).sum())
         route.total_distance = total_distance
         return total_distance
 
     def display_route_segments(self, route):
         """Display each segment of the route with distances."""
-        print("Route segments:")
-        for i in range(len(route.locations) - 1):
-            loc1 = route.locations[i]
-            loc2 = route.locations[i + 1]
+        names = None
+        if route.all_named:
+            try:
+                names = [loc.name for loc in route.locations]
+            except AttributeError:  # A coordinate stop was put in the list directly
+                pass
+        if names is None:
+            names = [loc.name if isinstance(loc, Location) else f"Coordinates {loc}" for loc in route.locations]
+
+        # Build the whole report first so it is written with a single print call
+        lines = ["Route segments:"]
+        stops = route.locations
+        for loc1, loc2, name1, name2 in zip(stops, stops[1:], names, names[1:]):
             distance = self.calculate_distance_between(loc1, loc2)
-
-            name1 = loc1.name if isinstance(loc1, Location) else f"Coordinates {loc1}"
-            name2 = loc2.name if isinstance(loc2, Location) else f"Coordinates {loc2}"
-
-            print(f"  {name1} -> {name2}: {self.format_distance(distance)}")
+            lines.append(f"  {name1} -> {name2}: {self.format_distance(distance)}")
+        print("\n".join(lines))
 
     def create_route(self, location_inputs):
         """Create a route from a list of location names or coordinates."""
@@ -99,54 +147,42 @@ class IGPS:
             print("Error: A route must have at least 2 locations.")
             return None
 
-        locations = []
-        for loc_input in location_inputs:
-            loc = self.get_location(loc_input)
-            if loc is None:
-                return None
-            locations.append(loc)
+        locations = self._resolve_locations(location_inputs)
+        if locations is None:
+            return None
 
         route = Route(locations)
         distance = self.calculate_route_distance(route)
         print(f"Route created with total distance: {self.format_distance(distance)}")
         return route
 
-    def optimize_route(self, location_inputs):
-        """Create an optimized route using nearest neighbor algorithm (approximation for TSP)."""
+    def optimize_route(self, location_inputs, use_two_opt=True):
+        """Create an optimized route using nearest neighbor algorithm (approximation for TSP).
+        With use_two_opt, the tour is then refined with 2-opt, keeping the same start."""
         if len(location_inputs) < 2:
             print("Error: A route must have at least 2 locations.")
             return None
 
-        locations = []
-        for loc_input in location_inputs:
-            loc = self.get_location(loc_input)
-            if loc is None:
-                return None
-            locations.append(loc)
+        locations = self._resolve_locations(location_inputs)
+        if locations is None:
+            return None
 
         if len(locations) == 2:
             return Route(locations)
 
-        # Start with first location, then use nearest neighbor
-        optimized = [locations[0]]
-        remaining = locations[1:]
-
-        while remaining:
-            current = optimized[-1]
-            nearest = min(remaining, key=lambda loc: self.calculate_distance_between(current, loc))
-            optimized.append(nearest)
-            remaining.remove(nearest)
-
-        route = Route(optimized)
+        # Start with first location, then use nearest neighbor over the stacked coordinates
+        pts = _stack_positions(locations)
+        order = nn_tour(pts)
+        if use_two_opt:
+            # Same positions as the nearest neighbor pass, so both steps see one snapshot
+            order = two_opt(order, distance_matrix(pts))
+        route = Route([locations[i] for i in order])
         distance = self.calculate_route_distance(route)
         print(f"Optimized route created with total distance: {self.format_distance(distance)}")
         return route
 
     def calculate_fuel_required(self, route):
         """Calculate fuel required for a route in gallons."""
-        if route.total_distance == 0:
-            self.calculate_route_distance(route)
-
         fuel_gallons = route.total_distance / self.FUEL_EFFICIENCY
         print(f"Route distance: {self.format_distance(route.total_distance)}")
         print(f"Fuel required: {fuel_gallons:.2f} gallons")
@@ -163,9 +199,6 @@ class IGPS:
         if speed is None:
             speed = self.AVG_SPEED
 
-        if route.total_distance == 0:
-            self.calculate_route_distance(route)
-
         time_hours = route.total_distance / speed
 
         days = int(time_hours / 24)
@@ -185,20 +218,28 @@ class IGPS:
     def validate_coordinates(self, position):
         """Check if coordinates are within the Milky Way galaxy bounds."""
         x, y, z = position
+        if coordinates_in_bounds(x, y, z):
+            return True
 
-        radius_from_center = np.sqrt(x**2 + z**2)
-        if radius_from_center > self.GALAXY_RADIUS:
+        # Out of bounds: work out which limit was exceeded for the warning
+        if x * x + z * z > GALAXY_RADIUS_SQ:
+            radius_from_center = math.hypot(x, z)
             print(f"WARNING: Coordinates ({x}, {y}, {z}) are outside galaxy radius!")
-            print(f"Distance from center: {radius_from_center:.2f} LY (max: {self.GALAXY_RADIUS} LY)")
+            print(f"Distance from center: {radius_from_center:.2f} LY (max: {GALAXY_RADIUS} LY)")
             return False
 
-        if abs(y) > self.GALAXY_HEIGHT:
+        if abs(y) > GALAXY_HEIGHT:
             print(f"WARNING: Y-coordinate {y} exceeds galaxy height!")
-            print(f"Galaxy height range: -{self.GALAXY_HEIGHT} to +{self.GALAXY_HEIGHT} LY")
+            print(f"Galaxy height range: -{GALAXY_HEIGHT} to +{GALAXY_HEIGHT} LY")
             return False
 
         return True
 
+    def validate_coordinates_bulk(self, positions):
+        """Check many (x, y, z) coordinates against the galaxy bounds at once.
+        Returns a boolean array, True where the coordinates are inside the galaxy."""
+        return positions_in_bounds(np.asarray(positions, dtype=COORDINATE_DTYPE).reshape(-1, 3))
+
     def add_stop_to_route(self, route, location_input):
         """Add a stop to an existing route and automatically optimize its position for minimum distance.
         The new stop will never become the starting location - it can only be inserted between
@@ -213,24 +254,14 @@ class IGPS:
             print(f"Stop added. New total distance: {self.format_distance(route.total_distance)}")
             return True
 
-        # Try inserting the new location at each possible position EXCEPT position 0 (start)
-        best_index = len(route.locations)  # Default: add at end
-        best_distance = float('inf')
-
-        for i in range(1, len(route.locations) + 1):  # Start from 1, not 0
-            temp_locations = route.locations.copy()
-            temp_locations.insert(i, location)
-            temp_route = Route(temp_locations)
-            temp_distance = self.calculate_route_distance(temp_route)
-
-            if temp_distance < best_distance:
-                best_distance = temp_distance
-                best_index = i
+        # Cost of inserting at index i is d(L[i-1], new) + d(new, L[i]) - d(L[i-1], L[i]);
+        # evaluate every index EXCEPT 0 (start) in one pass instead of re-summing the route per index
+        pts = route.coordinates()
+        position = location.position if isinstance(location, Location) else location
+        new = np.asarray(position, dtype=COORDINATE_DTYPE)
+        best_index = int(insertion_costs(pts, new).argmin()) + 1
 
-        route.locations.insert(best_index, location)
-        route.starting_location = route.locations[0]
-        route.ending_location = route.locations[-1]
-        self.calculate_route_distance(route)
+        route.add_stop(location, best_index)  # Updates total_distance by the same delta
 
         loc_name = location.name if isinstance(location, Location) else f"Coordinates {location}"
         print(f"Stop '{loc_name}' added at optimal position {best_index}.")
@@ -1,6 +1,34 @@
+import math
+import numpy as np
+
+# dtype for every coordinate array. float32 would halve memory traffic, but at galactic
+# coordinates (~50,000 LY) its spacing is ~0.004 LY, too coarse for light-minute distances.
+COORDINATE_DTYPE = np.float64
+
+# Milky Way Galaxy specifications: the one definition, shared by the database and IGPS layers
+GALAXY_RADIUS = 50000  # Light Years
+GALAXY_HEIGHT = 500    # Light Years (half-height from center)
+GALAXY_RADIUS_SQ = GALAXY_RADIUS * GALAXY_RADIUS
+
+
+def coordinates_in_bounds(x, y, z):
+    """Check coordinates against the galaxy radius and height."""
+    # Squared radius compare avoids a sqrt; the height check is a single chained compare
+    return x * x + z * z <= GALAXY_RADIUS_SQ and -GALAXY_HEIGHT <= y <= GALAXY_HEIGHT
+
+
+def positions_in_bounds(pts):
+    """Check every row of an (N, 3) coordinate array against the galaxy bounds at once.
+    Returns a boolean array, True where the coordinates are inside the galaxy."""
+    return ((pts[:, 0] * pts[:, 0] + pts[:, 2] * pts[:, 2] <= GALAXY_RADIUS_SQ)
+            & (np.abs(pts[:, 1]) <= GALAXY_HEIGHT))
+
+
 class Location:
     """DOMAIN MODEL: Represents a location with name, type, and 3D coordinates."""
-    
+
+    __slots__ = ('name', 'location_type', 'position')
+
     def __init__(self, name, location_type, position):
         self.name = name
         self.location_type = location_type
@@ -22,14 +50,112 @@ class Location:
         return f"Location({self.name}, {self.location_type}, {self.position})"
 
 
+def _coordinate_length(loc1, loc2, *, _sqrt=math.sqrt):
+    # Coordinate tuples first; also the fallback for any type not in _SEGMENT_LENGTHS.
+    # math.sqrt is bound as a keyword-only default so it is read as a local, not math + .sqrt
+    x1, y1, z1 = loc1.position if isinstance(loc1, Location) else loc1
+    x2, y2, z2 = loc2.position if isinstance(loc2, Location) else loc2
+    dx = x2 - x1
+    dy = y2 - y1
+    dz = z2 - z1
+    return _sqrt(dx * dx + dy * dy + dz * dz)
+
+
+def _location_length(loc1, loc2, *, _sqrt=math.sqrt):
+    x1, y1, z1 = loc1.position
+    x2, y2, z2 = loc2.position if isinstance(loc2, Location) else loc2
+    dx = x2 - x1
+    dy = y2 - y1
+    dz = z2 - z1
+    return _sqrt(dx * dx + dy * dy + dz * dz)
+
+
+def _array_length(loc1, loc2):
+    # Array inputs go straight to NumPy
+    pos2 = loc2.position if isinstance(loc2, Location) else loc2
+    return float(np.linalg.norm(np.subtract(pos2, loc1)))
+
+
+_SEGMENT_LENGTHS = {Location: _location_length, tuple: _coordinate_length, np.ndarray: _array_length}
+
+
+def segment_length(loc1, loc2):
+    """Euclidean distance between two stops (Location objects, (x, y, z) coordinates or arrays).
+    Picks the variant with one dict lookup on the first stop's exact type; the second stop
+    needs only a single isinstance check."""
+    return _SEGMENT_LENGTHS.get(type(loc1), _coordinate_length)(loc1, loc2)
+
+
+def _stack_positions(stops, all_named=False):
+    """Stack the positions of stops (Location objects or (x, y, z) coordinates) into an
+    (N, 3) COORDINATE_DTYPE array. all_named skips the per-stop type check."""
+    if all_named:
+        try:
+            positions = [loc.position for loc in stops]
+        except AttributeError:  # A non-Location stop was put in the list directly; check every stop
+            all_named = False
+    if not all_named:
+        positions = [loc.position if isinstance(loc, Location) else loc for loc in stops]
+    return np.asarray(positions, dtype=COORDINATE_DTYPE).reshape(-1, 3)
+
+
 class Route:
     """DOMAIN MODEL: Represents a route with multiple locations."""
-    
+
+    __slots__ = ('locations', 'starting_location', 'ending_location', '_total_distance', 'all_named',
+                 '_name_to_index')
+
     def __init__(self, locations):
         self.locations = locations
         self.starting_location = locations[0] if locations else None
         self.ending_location = locations[-1] if locations else None
-        self.total_distance = 0
+        self._total_distance = None  # None until computed, or after a change it can't track
+        self._name_to_index = None    # Location name -> first index, built on first index_of
+        self._update_all_named()
+
+    @property
+    def total_distance(self):
+        """Total distance of the route, summed from its segments only when not already known."""
+        if self._total_distance is None:
+            pts = self.coordinates()
+            self._total_distance = float(np.linalg.norm(pts[1:] - pts[:-1], axis=1).sum())
+        return self._total_distance
+
+    @total_distance.setter
+    def total_distance(self, distance):
+        self._total_distance = distance
+
+    def _stop_delta(self, index, location):
+        """Distance gained by visiting location at index, between its neighbors in the current list."""
+        prev_loc = self.locations[index - 1] if index > 0 else None
+        next_loc = self.locations[index] if index < len(self.locations) else None
+        delta = 0.0
+        if prev_loc is not None:
+            delta += segment_length(prev_loc, location)
+        if next_loc is not None:
+            delta += segment_length(location, next_loc)
+        if prev_loc is not None and next_loc is not None:
+            delta -= segment_length(prev_loc, next_loc)
+        return delta
+
+    def _update_all_named(self):
+        """Record whether every stop is a named Location, so loops can skip per-stop type checks.
+        Only Route's own methods keep it current, so readers fall back to per-stop checks if a
+        stop turns out not to be a Location (e.g. after locations was changed directly)."""
+        self.all_named = all(isinstance(loc, Location) for loc in self.locations)
+
+    def index_of(self, name):
+        """Get the index of the first stop with the given location name, or None if not on the route."""
+        if self._name_to_index is None:
+            self._name_to_index = {}
+            for i, loc in enumerate(self.locations):
+                if isinstance(loc, Location):
+                    self._name_to_index.setdefault(loc.name, i)
+        return self._name_to_index.get(name)
+
+    def coordinates(self):
+        """Return the route's positions as an (N, 3) COORDINATE_DTYPE array, one row per stop."""
+        return _stack_positions(self.locations, self.all_named)
 
     def set_starting_location(self, location):
         """Set the starting location."""
@@ -38,6 +164,9 @@ class Route:
         else:
             self.locations.append(location)
         self.starting_location = location
+        self._total_distance = None
+        self._name_to_index = None
+        self._update_all_named()
 
     def set_ending_location(self, location):
         """Set the ending location."""
@@ -46,22 +175,37 @@ class Route:
         else:
             self.locations.append(location)
         self.ending_location = location
+        self._total_distance = None
+        self._name_to_index = None
+        self._update_all_named()
 
     def add_stop(self, location, index=None):
         """Add a stop to the route at a specific index, or at the end."""
+        insert_at = len(self.locations) if index is None else slice(index, None).indices(len(self.locations))[0]
+        if self._total_distance is not None:
+            self._total_distance += self._stop_delta(insert_at, location)
+
         if index is not None:
             self.locations.insert(index, location)
+            self._name_to_index = None  # Later stops shift, so rebuild on next lookup
         else:
             self.locations.append(location)
+            if self._name_to_index is not None and isinstance(location, Location):
+                self._name_to_index.setdefault(location.name, len(self.locations) - 1)
         self.ending_location = self.locations[-1]
+        self.all_named = self.all_named and isinstance(location, Location)
 
     def remove_stop(self, index):
         """Remove a stop from the route."""
         if 0 <= index < len(self.locations):
-            self.locations.pop(index)
+            location = self.locations.pop(index)
+            if self._total_distance is not None:
+                self._total_distance -= self._stop_delta(index, location)
+            self._name_to_index = None
             if self.locations:
                 self.starting_location = self.locations[0]
                 self.ending_location = self.locations[-1]
+            self._update_all_named()
             return True
         return False
 
@@ -69,9 +213,18 @@ class Route:
         return f"Route with {len(self.locations)} locations"
 
 
+def _saved_key(item):
+    """Key for spotting an already-saved item: coordinate tuples compare by value, while
+    Location and Route objects compare by identity, as they do in a list."""
+    return item if isinstance(item, tuple) else id(item)
+
+
 class Member:
     """DOMAIN MODEL: Represents a registered member of the IGPS system."""
-    
+
+    __slots__ = ('member_id', 'name', 'home', 'work', 'saved_locations', 'saved_routes',
+                 '_saved_location_keys', '_saved_route_keys')
+
     def __init__(self, member_id, name, home=None, work=None):
         self.member_id = member_id
         self.name = name
@@ -79,17 +232,53 @@ class Member:
         self.work = work
         self.saved_locations = []
         self.saved_routes = []
+        # Keys of saved items, so saving skips duplicates without scanning the lists; kept in
+        # step by the save and remove methods below
+        self._saved_location_keys = set()
+        self._saved_route_keys = set()
 
     def save_location(self, location):
         """Save a location for quick access."""
+        key = _saved_key(location)
+        if key in self._saved_location_keys:
+            print(f"Location already saved for member {self.name}.")
+            return
         self.saved_locations.append(location)
+        self._saved_location_keys.add(key)
         print(f"Location saved for member {self.name}.")
 
     def save_route(self, route):
         """Save a route for future use."""
+        key = _saved_key(route)
+        if key in self._saved_route_keys:
+            print(f"Route already saved for member {self.name}.")
+            return
         self.saved_routes.append(route)
+        self._saved_route_keys.add(key)
         print(f"Route saved for member {self.name}.")
 
+    def remove_saved_location(self, location):
+        """Remove a saved location."""
+        key = _saved_key(location)
+        if key not in self._saved_location_keys:
+            print(f"Location not saved for member {self.name}.")
+            return False
+        self._saved_location_keys.remove(key)
+        self.saved_locations.remove(location)
+        print(f"Saved location removed for member {self.name}.")
+        return True
+
+    def remove_saved_route(self, route):
+        """Remove a saved route."""
+        key = _saved_key(route)
+        if key not in self._saved_route_keys:
+            print(f"Route not saved for member {self.name}.")
+            return False
+        self._saved_route_keys.remove(key)
+        self.saved_routes.remove(route)
+        print(f"Saved route removed for member {self.name}.")
+        return True
+
     def set_home(self, location):
         """Set home location."""
         self.home = location
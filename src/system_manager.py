@@ -42,6 +42,10 @@ class SystemManager:
         """Administrator: Add a location to the database."""
         return self.database.add_location(location)
 
+    def admin_add_locations(self, locations):
+        """Administrator: Add several locations to the database at once."""
+        return self.database.add_locations(locations)
+
     def admin_edit_location(self, location_name, new_name=None, new_type=None, new_position=None):
         """Administrator: Edit a location in the database."""
         return self.database.edit_location(location_name, new_name, new_type, new_position)
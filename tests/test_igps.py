@@ -1,16 +1,23 @@
+import math
 import unittest
 import numpy as np
-import sys
-import os
-
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.models import Location, Route, Member
 from src.database import LocationsDatabase
 from src.igps import IGPS
+from src import _kernels
 from src.system_manager import SystemManager
 
+# Reference distances between the Earth (0, 0, 0), Mars (10, 5, 2) and Jupiter (30, 15, 8) fixtures
+EARTH_TO_MARS = math.sqrt(10**2 + 5**2 + 2**2)
+MARS_TO_JUPITER = math.sqrt(20**2 + 10**2 + 6**2)
+EARTH_TO_JUPITER = math.sqrt(30**2 + 15**2 + 8**2)
+
+
+def _close(a, b):
+    """Check two distances agree to within 0.01 LY; arrays use np.testing.assert_allclose."""
+    return math.isclose(a, b, abs_tol=1e-2)
+
 
 class TestLocation(unittest.TestCase):
     """UNIT TESTS: Location class - Tests basic CRUD operations and data integrity"""
@@ -63,6 +70,15 @@ class TestLocationsDatabase(unittest.TestCase):
         result = self.db.add_location(self.earth)
         self.assertFalse(result)
 
+    def test_add_locations_batch(self):
+        """Test adding several locations at once skips names that already exist."""
+        self.db.add_location(self.earth)
+        venus = Location("Venus", "Planet", (-3, 1, 4))
+        result = self.db.add_locations([self.mars, self.earth, venus])
+        self.assertEqual(result, 2)
+        self.assertEqual(self.db.location_names(), ["Earth", "Mars", "Venus"])
+        self.assertEqual(self.db.coordinates().tolist(), [[0, 0, 0], [10, 5, 2], [-3, 1, 4]])
+
     def test_remove_location(self):
         """Test removing a location from the database."""
         self.db.add_location(self.earth)
@@ -104,6 +120,40 @@ class TestLocationsDatabase(unittest.TestCase):
         result = self.db.edit_location("Jupiter", new_name="Big Jupiter")
         self.assertFalse(result)
 
+    def test_coordinates_follow_changes(self):
+        """Test that the coordinate array stays aligned with names after add, edit and remove."""
+        self.db.add_location(self.earth)
+        self.db.add_location(self.mars)
+        self.db.edit_location("Mars", new_name="Red Planet", new_position=(1, 2, 3))
+        self.db.remove_location("Earth")
+        self.assertEqual(self.db.location_names(), ["Red Planet"])
+        self.assertEqual(self.db.coordinates().tolist(), [[1, 2, 3]])
+
+    def test_remove_location_keeps_rows_aligned(self):
+        """Test that removing a middle location keeps every remaining name on its own position."""
+        venus = Location("Venus", "Planet", (-3, 1, 4))
+        self.db.add_locations([self.earth, self.mars, venus])
+        self.db.remove_location("Earth")
+        positions = dict(zip(self.db.location_names(), self.db.coordinates().tolist()))
+        self.assertEqual(positions, {"Mars": [10, 5, 2], "Venus": [-3, 1, 4]})
+        self.assertTrue(_close(self.db.distance("Mars", "Venus"), math.sqrt(13**2 + 4**2 + 2**2)))
+
+    def test_distance_follows_edit(self):
+        """Test that distances use the new position after a location is moved."""
+        self.db.add_location(self.earth)
+        self.db.add_location(self.mars)
+        self.assertTrue(_close(self.db.distance("Earth", "Mars"), EARTH_TO_MARS))
+        self.db.edit_location("Mars", new_position=(3, 4, 0))
+        self.assertTrue(_close(self.db.distance("Earth", "Mars"), 5.0))
+
+    def test_coordinates_see_set_position(self):
+        """Test that moving a stored location directly is reflected in coordinates and distances."""
+        self.db.add_location(self.earth)
+        self.db.add_location(self.mars)
+        self.mars.set_position((3, 4, 0))
+        self.assertEqual(self.db.coordinates().tolist()[1], [3, 4, 0])
+        self.assertTrue(_close(self.db.distance("Earth", "Mars"), 5.0))
+
 
 class TestRoute(unittest.TestCase):
     """Test the Route class."""
@@ -141,6 +191,35 @@ class TestRoute(unittest.TestCase):
         self.assertTrue(result)
         self.assertEqual(len(route.locations), 2)
 
+    def test_total_distance_tracks_stops(self):
+        """Test that total_distance stays correct through add_stop and remove_stop."""
+        route = Route([self.earth, self.jupiter])
+        self.assertTrue(_close(route.total_distance, EARTH_TO_JUPITER))
+        route.add_stop(self.mars, 1)
+        expected = EARTH_TO_MARS + MARS_TO_JUPITER
+        self.assertTrue(_close(route.total_distance, expected))
+        route.remove_stop(0)
+        self.assertTrue(_close(route.total_distance, MARS_TO_JUPITER))
+
+    def test_index_of(self):
+        """Test looking up stop indices by name as the route changes."""
+        route = Route([self.earth, self.jupiter])
+        self.assertEqual(route.index_of("Jupiter"), 1)
+        route.add_stop(self.mars, 1)
+        self.assertEqual(route.index_of("Jupiter"), 2)
+        route.remove_stop(0)
+        self.assertEqual(route.index_of("Mars"), 0)
+        self.assertIsNone(route.index_of("Earth"))
+
+    def test_all_named_tracks_coordinate_stops(self):
+        """Test that all_named is cleared by a coordinate stop and restored when it is removed."""
+        route = Route([self.earth, self.mars])
+        self.assertTrue(route.all_named)
+        route.add_stop((1, 2, 3))
+        self.assertFalse(route.all_named)
+        route.remove_stop(2)
+        self.assertTrue(route.all_named)
+
     def test_remove_invalid_stop(self):
         """Test that removing an invalid index fails."""
         route = Route([self.earth, self.mars])
@@ -148,32 +227,68 @@ class TestRoute(unittest.TestCase):
         self.assertFalse(result)
 
 
-class TestIGPS(unittest.TestCase):
-    """UNIT TESTS: IGPS class (Business Logic Layer)"""
+class TestIGPSReadOnly(unittest.TestCase):
+    """UNIT TESTS: IGPS class (Business Logic Layer) - queries that never change the database"""
 
-    def setUp(self):
-        """Set up IGPS with a database."""
-        self.db = LocationsDatabase()
-        self.igps = IGPS(self.db)
+    @classmethod
+    def setUpClass(cls):
+        """Set up one IGPS and database shared by every read-only test."""
+        cls.db = LocationsDatabase()
+        cls.igps = IGPS(cls.db)
 
-        self.earth = Location("Earth", "Planet", (0, 0, 0))
-        self.mars = Location("Mars", "Planet", (10, 5, 2))
-        self.jupiter = Location("Jupiter", "Planet", (30, 15, 8))
+        cls.earth = Location("Earth", "Planet", (0, 0, 0))
+        cls.mars = Location("Mars", "Planet", (10, 5, 2))
+        cls.jupiter = Location("Jupiter", "Planet", (30, 15, 8))
 
-        self.db.add_location(self.earth)
-        self.db.add_location(self.mars)
-        self.db.add_location(self.jupiter)
+        cls.db.add_location(cls.earth)
+        cls.db.add_location(cls.mars)
+        cls.db.add_location(cls.jupiter)
 
     def test_calculate_distance_between_locations(self):
         """Test distance calculation between two Location objects."""
         distance = self.igps.calculate_distance_between(self.earth, self.mars)
-        expected = np.sqrt(10**2 + 5**2 + 2**2)
-        self.assertAlmostEqual(distance, expected, places=2)
+        expected = EARTH_TO_MARS
+        self.assertTrue(_close(distance, expected))
 
     def test_calculate_distance_between_coordinates(self):
         """Test distance calculation between coordinate tuples."""
         distance = self.igps.calculate_distance_between((0, 0, 0), (3, 4, 0))
-        self.assertAlmostEqual(distance, 5.0, places=2)
+        self.assertTrue(_close(distance, 5.0))
+        self.assertTrue(_close(IGPS.calculate_distance_between((0, 0, 0), (3, 4, 0)), 5.0))
+
+    def test_calculate_distance_between_arrays(self):
+        """Test distance calculation between NumPy coordinate arrays."""
+        distance = self.igps.calculate_distance_between(np.array([0.0, 0.0, 0.0]), np.array([3.0, 4.0, 0.0]))
+        self.assertTrue(_close(distance, 5.0))
+
+    def test_calculate_distances_between_batch(self):
+        """Test the many-to-many distance calculation against the single-pair version."""
+        sources = [self.earth, (3, 4, 0)]
+        targets = [self.mars, self.jupiter, (0, 0, 0)]
+        distances = self.igps.calculate_distances_between(sources, targets)
+        expected = [[self.igps.calculate_distance_between(a, b) for b in targets] for a in sources]
+        np.testing.assert_allclose(distances, expected, atol=1e-2)
+
+    def test_pairwise_distances(self):
+        """Test that pairwise distances are symmetric with a zero diagonal."""
+        distances = self.igps.pairwise_distances([self.earth, self.mars, self.jupiter])
+        self.assertEqual(distances.shape, (3, 3))
+        np.testing.assert_allclose(distances, distances.T)
+        np.testing.assert_allclose(np.diag(distances), 0.0)
+        self.assertTrue(_close(distances[0, 1], EARTH_TO_MARS))
+
+    def test_format_distance(self):
+        """Test that distances use light minutes below 0.01 LY and light years otherwise."""
+        self.assertEqual(self.igps.format_distance(0.005), "2628.00 light minutes")
+        self.assertEqual(self.igps.format_distance(4.1231), "4.12 light years")
+
+    def test_calculate_route_distance(self):
+        """Test that route distance is the sum of all segment distances."""
+        route = Route([self.earth, self.mars, self.jupiter])
+        distance = self.igps.calculate_route_distance(route)
+        expected = EARTH_TO_MARS + MARS_TO_JUPITER
+        self.assertTrue(_close(distance, expected))
+        self.assertTrue(_close(route.total_distance, expected))
 
     def test_get_location_by_name(self):
         """Test retrieving a location by name."""
@@ -185,12 +300,103 @@ class TestIGPS(unittest.TestCase):
         result = self.igps.get_location("Neptune")
         self.assertIsNone(result)
 
+    def test_optimize_route_nearest_neighbor(self):
+        """Test that optimize_route keeps the start and visits the nearest location next."""
+        route = self.igps.optimize_route(["Earth", "Jupiter", "Mars"])
+        self.assertEqual([loc.name for loc in route.locations], ["Earth", "Mars", "Jupiter"])
+        expected = EARTH_TO_MARS + MARS_TO_JUPITER
+        self.assertTrue(_close(route.total_distance, expected))
+
+    def test_nn_tour_matches_numpy_fallback(self):
+        """Test that the plain-loop nearest neighbor kernel, compiled or not, agrees with the NumPy fallback."""
+        pts = np.array([[0, 0, 0], [30, 15, 8], [10, 5, 2], [12, 6, 3], [-5, 0, 1]], dtype=np.float64)
+        expected = list(_kernels._nn_tour_numpy(pts))
+        self.assertEqual(list(_kernels._nn_tour_loops(pts)), expected)
+        self.assertEqual(list(_kernels.nn_tour(pts)), expected)
+
+    def test_two_opt_loops_and_numpy_fallback(self):
+        """Test that the uncompiled 2-opt loops and the NumPy fallback both shorten a tour."""
+        pts = np.array([[-8, -1, 9], [-8, -3, -2], [8, -6, 0], [-5, -10, 5], [-9, -5, -1]], dtype=np.float64)
+        dist = _kernels.distance_matrix(pts)
+        nearest = _kernels._nn_tour_numpy(pts)
+        length = lambda order: dist[order[:-1], order[1:]].sum()
+        for two_opt in (_kernels._two_opt_loops, _kernels._two_opt_numpy):
+            order = two_opt(nearest.copy(), dist)
+            self.assertEqual(order[0], 0)
+            self.assertEqual(sorted(order), list(range(5)))
+            self.assertLess(length(order), length(nearest) - 1)
+
+        # Three stops: only the last two can swap, and both backends must take that swap
+        dist = _kernels.distance_matrix(np.array([[0, 0, 0], [1, 0, 0], [10, 0, 0]], dtype=np.float64))
+        for two_opt in (_kernels._two_opt_loops, _kernels._two_opt_numpy):
+            self.assertEqual(list(two_opt(np.array([0, 2, 1]), dist)), [0, 1, 2])
+
+    def test_insertion_costs_match_numpy_fallback(self):
+        """Test that the plain-loop insertion cost kernel, compiled or not, agrees with the NumPy fallback."""
+        pts = np.array([[0, 0, 0], [30, 15, 8], [12, 6, 3]], dtype=np.float64)
+        new = np.array([10, 5, 2], dtype=np.float64)
+        expected = _kernels._insertion_costs_numpy(pts, new)
+        np.testing.assert_allclose(_kernels._insertion_costs_loops(pts, new), expected)
+        np.testing.assert_allclose(_kernels.insertion_costs(pts, new), expected)
+
+    def test_validate_coordinates_valid(self):
+        """Test that valid coordinates pass validation."""
+        result = self.igps.validate_coordinates((1000, 200, 500))
+        self.assertTrue(result)
+
+    def test_validate_coordinates_exceeds_radius(self):
+        """Test that coordinates beyond galaxy radius fail validation."""
+        result = self.igps.validate_coordinates((60000, 0, 0))
+        self.assertFalse(result)
+
+    def test_validate_coordinates_exceeds_height(self):
+        """Test that coordinates beyond galaxy height fail validation."""
+        result = self.igps.validate_coordinates((1000, 600, 0))
+        self.assertFalse(result)
+
+    def test_validate_coordinates_bulk(self):
+        """Test that bulk validation flags each coordinate like the single version."""
+        positions = [(1000, 200, 500), (60000, 0, 0), (1000, 600, 0), (0, -500, 50000)]
+        result = self.igps.validate_coordinates_bulk(positions)
+        self.assertEqual(result.tolist(), [True, False, False, True])
+
+
+class TestIGPSMutating(unittest.TestCase):
+    """UNIT TESTS: IGPS class (Business Logic Layer) - route building and database changes"""
+
+    def setUp(self):
+        """Set up IGPS with a database."""
+        self.db = LocationsDatabase()
+        self.igps = IGPS(self.db)
+
+        self.earth = Location("Earth", "Planet", (0, 0, 0))
+        self.mars = Location("Mars", "Planet", (10, 5, 2))
+        self.jupiter = Location("Jupiter", "Planet", (30, 15, 8))
+
+        self.db.add_location(self.earth)
+        self.db.add_location(self.mars)
+        self.db.add_location(self.jupiter)
+
+    def test_calculate_distance_between_sees_set_position(self):
+        """Test that distances between stored locations use their current positions."""
+        self.igps.calculate_distance_between(self.earth, self.mars)
+        self.mars.set_position((6, 8, 0))
+        self.assertTrue(_close(self.igps.calculate_distance_between(self.earth, self.mars), 10.0))
+
     def test_create_route_valid(self):
         """Test creating a valid route."""
         route = self.igps.create_route(["Earth", "Mars"])
         self.assertIsNotNone(route)
         self.assertEqual(len(route.locations), 2)
 
+    def test_route_with_stop_appended_directly(self):
+        """Test that a coordinate stop appended straight to route.locations is still handled."""
+        route = self.igps.create_route(["Earth", "Mars"])
+        route.locations.append((6, 8, 0))
+        distance = self.igps.calculate_route_distance(route)
+        self.assertTrue(_close(distance, EARTH_TO_MARS + math.sqrt(4**2 + 3**2 + 2**2)))
+        self.igps.display_route_segments(route)
+
     def test_create_route_insufficient_locations(self):
         """Test that creating a route with less than 2 locations fails."""
         route = self.igps.create_route(["Earth"])
@@ -201,6 +407,18 @@ class TestIGPS(unittest.TestCase):
         route = self.igps.create_route(["Earth", "Neptune"])
         self.assertIsNone(route)
 
+    def test_optimize_route_two_opt_shortens_tour(self):
+        """Test that 2-opt refinement fixes a tour that nearest neighbor alone gets wrong."""
+        names = ["A", "B", "C", "D", "E"]
+        positions = [(-8, -1, 9), (-8, -3, -2), (8, -6, 0), (-5, -10, 5), (-9, -5, -1)]
+        for name, position in zip(names, positions):
+            self.db.add_location(Location(name, "Star", position))
+
+        nearest = self.igps.optimize_route(names, use_two_opt=False)
+        refined = self.igps.optimize_route(names)
+        self.assertEqual(refined.starting_location.name, "A")
+        self.assertLess(refined.total_distance, nearest.total_distance - 1)
+
     def test_add_stop_optimization(self):
         """Test that adding a stop automatically optimizes its position in the middle."""
         route = self.igps.create_route(["Earth", "Jupiter"])
@@ -223,9 +441,16 @@ class TestIGPS(unittest.TestCase):
         self.assertEqual(route.starting_location, original_start)
         self.assertEqual(route.locations[0].name, "Mars")
 
-        earth_index = next(i for i, loc in enumerate(route.locations) if loc.name == "Earth")
+        earth_index = route.index_of("Earth")
         self.assertGreater(earth_index, 0, "New stop should not be at position 0")
 
+    def test_add_stop_updates_total_distance(self):
+        """Test that the incrementally updated distance matches a full recalculation."""
+        route = self.igps.create_route(["Earth", "Jupiter"])
+        self.igps.add_stop_to_route(route, "Mars")
+        incremental = route.total_distance
+        self.assertTrue(_close(incremental, self.igps.calculate_route_distance(route)))
+
     def test_add_stop_to_short_route(self):
         """Test adding a stop to a route with less than 2 locations."""
         route = Route([self.earth])
@@ -233,21 +458,6 @@ class TestIGPS(unittest.TestCase):
         self.assertTrue(result)
         self.assertEqual(len(route.locations), 2)
 
-    def test_validate_coordinates_valid(self):
-        """Test that valid coordinates pass validation."""
-        result = self.igps.validate_coordinates((1000, 200, 500))
-        self.assertTrue(result)
-
-    def test_validate_coordinates_exceeds_radius(self):
-        """Test that coordinates beyond galaxy radius fail validation."""
-        result = self.igps.validate_coordinates((60000, 0, 0))
-        self.assertFalse(result)
-
-    def test_validate_coordinates_exceeds_height(self):
-        """Test that coordinates beyond galaxy height fail validation."""
-        result = self.igps.validate_coordinates((1000, 600, 0))
-        self.assertFalse(result)
-
 
 class TestMember(unittest.TestCase):
     """Test the Member class."""
@@ -268,6 +478,34 @@ class TestMember(unittest.TestCase):
         self.assertEqual(len(member.saved_locations), 1)
         self.assertIn(loc, member.saved_locations)
 
+    def test_save_location_twice(self):
+        """Test that saving the same location again does not duplicate it."""
+        member = Member("M001", "John Doe")
+        loc = Location("Favorite Spot", "Station", (100, 200, 300))
+        member.save_location(loc)
+        member.save_location(loc)
+        self.assertEqual(len(member.saved_locations), 1)
+        self.assertEqual(list(member.saved_locations), [loc])
+
+    def test_save_coordinates_twice(self):
+        """Test that saved coordinates are matched by value, not by object."""
+        member = Member("M001", "John Doe")
+        member.save_location(tuple([1, 2, 3]))
+        member.save_location(tuple([1, 2, 3]))
+        self.assertEqual(member.saved_locations, [(1, 2, 3)])
+        self.assertIn(tuple([1, 2, 3]), member.saved_locations)
+
+    def test_remove_saved_location(self):
+        """Test that a removed location can be saved again, and removing it twice fails."""
+        member = Member("M001", "John Doe")
+        loc = Location("Favorite Spot", "Station", (100, 200, 300))
+        member.save_location(loc)
+        self.assertTrue(member.remove_saved_location(loc))
+        self.assertFalse(member.remove_saved_location(loc))
+        self.assertEqual(member.saved_locations, [])
+        member.save_location(loc)
+        self.assertEqual(member.saved_locations, [loc])
+
     def test_save_route(self):
         """Test saving a route to member's saved routes."""
         member = Member("M001", "John Doe")